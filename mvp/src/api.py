@@ -10,17 +10,21 @@ Maps engine outcomes to HTTP statuses:
 - 400 Bad Request: schema/validation error
 - 422 Unprocessable Entity: no tool can satisfy
 - 500 Internal Server Error: tool crash
+
+The IR database defaults to the persistent .ir/ir.db; set AI2_API_DB_PATH to
+use another path (or ":memory:").
 """
 
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.responses import JSONResponse
 from typing import Optional, Dict, Any
+import os
 import uvicorn
 
 from .main import MVPAPI
 
 app = FastAPI(title="Deterministic Obligations API", version="0.1.0")
-api = MVPAPI()
+api = MVPAPI(os.getenv("AI2_API_DB_PATH") or None)
 
 
 def classify_status(trace: Dict[str, Any]) -> int:
@@ -73,6 +77,8 @@ def execute_obligations(body: Dict[str, Any], authorization: Optional[str] = Hea
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     code = classify_status(trace)
+    # tool_runs_by_name only re-indexes tool_runs for in-process callers
+    trace.pop("tool_runs_by_name", None)
     return JSONResponse(status_code=code, content=trace)
 
 
@@ -83,6 +89,19 @@ def list_tools():
 
 
 if __name__ == "__main__":
-    uvicorn.run("src.api:app", host="0.0.0.0", port=8000, reload=False)
+    import argparse
+
+    import socket
+
+    parser = argparse.ArgumentParser(description="Run the deterministic obligations API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000, help="0 picks a free port")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    # Bind here rather than in uvicorn so the actual port (e.g. for --port 0) can
+    # be announced on stdout before serving
+    sock = socket.create_server((args.host, args.port))
+    print(f"Listening on port {sock.getsockname()[1]}", flush=True)
+    uvicorn.Server(uvicorn.Config("src.api:app", log_level=args.log_level)).run(sockets=[sock])
 
 
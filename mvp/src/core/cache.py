@@ -160,7 +160,7 @@ def compute_dependency_hash(depends_on: List[str]) -> tuple[Optional[str], Dict[
     
     # Hash the dependency states
     dep_json = json.dumps(dependency_states, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(dep_json.encode('utf-8')).hexdigest(), dependency_snapshot
+    return hashlib.blake2b(dep_json.encode('utf-8'), digest_size=16).hexdigest(), dependency_snapshot
 
 
 def compute_input_hash(tool_name: str, inputs: Dict[str, Any], tool_version: str = "1.0.0", depends_on: List[str] = None) -> Dict[str, Any]:
@@ -188,7 +188,7 @@ def compute_input_hash(tool_name: str, inputs: Dict[str, Any], tool_version: str
         "tool_version": tool_version
     }
     input_only_json = json.dumps(input_only_data, sort_keys=True, separators=(',', ':'))
-    input_hash = hashlib.sha256(input_only_json.encode('utf-8')).hexdigest()
+    input_hash = hashlib.blake2b(input_only_json.encode('utf-8'), digest_size=16).hexdigest()
     
     # Compute dependency hash and snapshot
     dep_hash, dep_snapshot = compute_dependency_hash(depends_on or [])
@@ -205,7 +205,7 @@ def compute_input_hash(tool_name: str, inputs: Dict[str, Any], tool_version: str
         key_data["depends_on_hash"] = dep_hash
     
     key_json = json.dumps(key_data, sort_keys=True, separators=(',', ':'))
-    cache_key = hashlib.sha256(key_json.encode('utf-8')).hexdigest()
+    cache_key = hashlib.blake2b(key_json.encode('utf-8'), digest_size=16).hexdigest()
     
     return {
         "input_hash": input_hash,
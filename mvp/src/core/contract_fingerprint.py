@@ -2,10 +2,15 @@
 Compute contract fingerprints for tools.
 """
 
+import functools
 import hashlib
 import json
 from typing import Dict, Any
 
+import yaml
+
+from .tools import SafeLoader
+
 
 def compute_contract_fingerprint(contract_data: Dict[str, Any]) -> str:
     """Compute a fingerprint hash of a tool contract.
@@ -31,4 +36,13 @@ def compute_contract_fingerprint(contract_data: Dict[str, Any]) -> str:
     
     # Create stable JSON representation
     fingerprint_json = json.dumps(fingerprint_data, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(fingerprint_json.encode('utf-8')).hexdigest()
+    return hashlib.blake2b(fingerprint_json.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=512)
+def compute_contract_fingerprint_from_bytes(raw: bytes) -> str:
+    """Compute a contract fingerprint straight from raw YAML contract bytes.
+    
+    Memoized on the bytes, so each unique contract is parsed and hashed once per process.
+    """
+    return compute_contract_fingerprint(yaml.load(raw, Loader=SafeLoader) or {})
@@ -12,6 +12,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import logging
+import os
 import threading
 import uuid
 
@@ -140,6 +141,33 @@ class Trajectory:
     created_at: Optional[datetime] = None
 
 
+def tune_sqlite(conn: sqlite3.Connection, fast: bool = False, private: bool = False):
+    """Apply concurrency/speed pragmas to a connection.
+
+    WAL + synchronous=NORMAL avoids an fsync per commit; acceptable here since
+    tool_run rows are a recomputable cache.
+
+    fast drops durability entirely (synchronous=OFF, bigger page cache) for
+    throwaway test databases. private marks a connection nobody else can open
+    (":memory:"), so the journal can live in memory and the lock be held
+    exclusively; shared files keep WAL so other processes can still read them.
+    """
+    try:
+        if private:
+            conn.execute("PRAGMA journal_mode=MEMORY")
+            conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        else:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF" if fast else "PRAGMA synchronous=NORMAL")
+        if fast:
+            conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+    except Exception:
+        pass
+
+
 class IRDatabase:
     """Database interface for the IR system."""
     
@@ -147,18 +175,22 @@ class IRDatabase:
         """Initialize the database connection.
         
         If db_path is None, defaults to .ir/ir.db (persistent).
-        Use ":memory:" explicitly for ephemeral testing.
+        Use ":memory:" explicitly for ephemeral testing; in-memory databases,
+        and any database when AI2_TEST_FAST is set, skip durability pragmas.
+        SQLite URIs ("file:...", e.g. "file:name?mode=memory&cache=shared")
+        are passed through to sqlite3 as-is.
         Relative paths are resolved relative to mvp/ directory.
         """
         from pathlib import Path
         
+        is_uri = db_path is not None and db_path.startswith("file:")
         if db_path is None:
             # Default to persistent file-based storage
             base_dir = Path(__file__).resolve().parents[2]
             ir_dir = base_dir / ".ir"
             ir_dir.mkdir(exist_ok=True)
             db_path = str(ir_dir / "ir.db")
-        elif db_path != ":memory:" and not Path(db_path).is_absolute():
+        elif db_path != ":memory:" and not is_uri and not Path(db_path).is_absolute():
             # Resolve relative paths relative to mvp/ directory
             base_dir = Path(__file__).resolve().parents[2]
             resolved_path = (base_dir / db_path).resolve()
@@ -168,15 +200,10 @@ class IRDatabase:
         
         self.db_path = db_path
         # Allow use across threads (FastAPI/TestClient/uvicorn)
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, uri=is_uri)
         self.conn.row_factory = sqlite3.Row
-        # Basic concurrency pragmas
-        try:
-            self.conn.execute("PRAGMA journal_mode=WAL")
-            self.conn.execute("PRAGMA synchronous=NORMAL")
-            self.conn.execute("PRAGMA busy_timeout=3000")
-        except Exception:
-            pass
+        is_memory = db_path == ":memory:"
+        tune_sqlite(self.conn, fast=is_memory or bool(os.getenv("AI2_TEST_FAST")), private=is_memory)
         # Serialize DB access across threads
         self._lock = threading.RLock()
         self._create_tables()
@@ -240,20 +267,22 @@ class IRDatabase:
     
     def create_entity(self, entity: Entity) -> str:
         """Create a new entity."""
-        cursor = self.conn.cursor()
+        return self.create_entities([entity])[0]
+    
+    def create_entities(self, entities: List[Entity]) -> List[str]:
+        """Create several entities in one executemany call and a single commit."""
         with self._lock:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            self.conn.executemany("""
             INSERT INTO entity (id, type, alias_jsonb, created_at)
             VALUES (?, ?, ?, ?)
-        """, (
+        """, [(
                 entity.id,
                 entity.type,
                 json.dumps(entity.alias_jsonb) if entity.alias_jsonb else None,
                 entity.created_at or datetime.now().isoformat()
-            ))
+            ) for entity in entities])
             self.conn.commit()
-        return entity.id
+        return [entity.id for entity in entities]
     
     def create_relation(self, relation: Relation) -> str:
         """Create a new relation."""
@@ -393,6 +422,14 @@ class IRDatabase:
                 return json.loads(row[0])
         return None
 
+    def clear_tool_runs(self) -> int:
+        """Delete all tool runs (the tool result cache). Returns the number deleted."""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM tool_run")
+            self.conn.commit()
+        return cursor.rowcount
+
     def create_rule(self, rule: Rule) -> str:
         """Create a new rule."""
         with self._lock:
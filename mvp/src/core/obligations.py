@@ -5,7 +5,9 @@ This module handles parsing natural language into obligations
 and validating obligation structures against the schema.
 """
 
+import functools
 import json
+import os
 import jsonschema
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
@@ -14,6 +16,19 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _compiled_validator(schema_path: str):
+    """Load a schema and build its checked validator once per path.
+
+    Callers pass an absolute path so a cwd change can't serve a stale schema.
+    """
+    with open(schema_path, "r") as f:
+        schema = json.load(f)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
 @dataclass
 class ObligationPayload:
     """Represents an obligation payload."""
@@ -53,13 +68,17 @@ class ObligationValidator:
     
     def __init__(self, schema_path: str = "schemas/obligation.schema.json"):
         """Initialize with schema."""
-        with open(schema_path, "r") as f:
-            self.schema = json.load(f)
+        self._validator = _compiled_validator(os.path.abspath(schema_path))
+        self.schema = self._validator.schema
     
     def validate(self, obligations_data: Dict) -> bool:
         """Validate obligations data against schema."""
         try:
-            jsonschema.validate(obligations_data, self.schema)
+            # Same error selection as jsonschema.validate, minus the per-call
+            # meta-schema check and validator construction
+            error = jsonschema.exceptions.best_match(self._validator.iter_errors(obligations_data))
+            if error is not None:
+                raise error
             return True
         except jsonschema.ValidationError as e:
             logger.error(f"Schema validation failed: {e.message}")
@@ -15,6 +15,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import logging
 
+from .tools import SafeLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,7 +48,7 @@ class SkillRegistry:
                     if skill_file.suffix == ".json":
                         skill_data = json.load(f)
                     else:
-                        skill_data = yaml.safe_load(f)
+                        skill_data = yaml.load(f, Loader=SafeLoader)
                 
                 name = skill_data.get("name")
                 version = skill_data.get("version", "1.0.0")
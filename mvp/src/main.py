@@ -7,7 +7,7 @@ integrating all components into a cohesive request processing pipeline.
 
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from .core.database import IRDatabase
@@ -72,8 +72,7 @@ class MVPRequestHandler:
                 Entity("E5", "location", {"aliases": ["Seattle", "Seattle WA"]})
             ]
             
-            for entity in entities:
-                self.db.create_entity(entity)
+            self.db.create_entities(entities)
             
             # Sample relations
             relations = [
@@ -99,6 +98,9 @@ class MVPRequestHandler:
             logger.info("Sample data loaded successfully")
             
         except Exception as e:
+            # Don't leave the failed INSERT's transaction open: it would hold the
+            # write lock and block every other connection to a shared DB file
+            self.db.conn.rollback()
             logger.warning(f"Failed to load sample data: {e}")
     
     def process_request(self, user_input: str) -> Dict[str, Any]:
@@ -216,10 +218,31 @@ class MVPAPI:
     def execute_obligations(self, obligations: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute obligations directly (deterministic-only path).
+
+        The returned trace also carries tool_runs_by_name: tool name -> list of
+        tool_runs entries, in execution order (runs without a tool name, e.g.
+        a clarify, are left out). It is an in-process convenience and is not
+        part of the HTTP response.
         """
         # Feed directly into conductor
-        return self.handler.conductor.process_request("(api)", obligations)
-    
+        trace = self.handler.conductor.process_request("(api)", obligations)
+        # Index tool runs by name in one pass so callers don't rescan the list
+        tool_runs_by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for tool_run in trace.get("tool_runs", []):
+            tool_name = tool_run.get("tool_name")
+            if tool_name:
+                tool_runs_by_name.setdefault(tool_name, []).append(tool_run)
+        trace["tool_runs_by_name"] = tool_runs_by_name
+        return trace
+
+    def clear_tool_cache(self) -> int:
+        """Drop cached tool results so the next run executes every tool.
+
+        Returns:
+            int: Number of cached tool runs removed
+        """
+        return self.handler.db.clear_tool_runs()
+
     def status(self) -> Dict[str, Any]:
         """Get system status."""
         return self.handler.get_system_status()
@@ -0,0 +1,27 @@
+"""orjson-backed JSON helpers for tests."""
+
+import codecs
+import functools
+from pathlib import Path
+
+import orjson
+
+loads = orjson.loads
+
+# Request bodies: orjson's bytes go on the wire as-is
+encode = orjson.dumps
+
+
+def dumps(obj, indent: bool = False) -> str:
+    """Serialize to a str (orjson returns bytes)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+
+
+@functools.lru_cache(maxsize=None)
+def load_file(path) -> object:
+    """Parse a JSON file (UTF-8, optional BOM) once per path.
+
+    The result is shared between callers; copy it before mutating.
+    """
+    raw = Path(path).read_bytes()
+    return orjson.loads(raw[len(codecs.BOM_UTF8):] if raw.startswith(codecs.BOM_UTF8) else raw)
@@ -0,0 +1,272 @@
+"""
+Shared pytest fixtures.
+
+Building an MVPAPI loads every tool contract and creates the IR schema, so
+these fixtures build them once per module/session instead of per test.
+"""
+
+import copy
+import os
+import pickle
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import orjson
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+# Test databases are throwaway; let IRDatabase skip durability pragmas
+os.environ.setdefault("AI2_TEST_FAST", "1")
+# Importing src.api builds its module-level MVPAPI; keep it off the developer's .ir/ir.db
+os.environ.setdefault("AI2_API_DB_PATH", ":memory:")
+
+from _fastjson import load_file
+from src.core.database import IRDatabase
+from src.core.tools import ToolRegistry
+from src.main import MVPAPI
+from src.translators.translators import MockLLM, TranslatorIn, TranslatorOut
+
+
+@pytest.fixture(scope="session")
+def schemas():
+    """Every schemas/*.json file, parsed once and keyed by file stem.
+
+    Shared across tests without copying: execute_obligations never mutates
+    its input (see test_execute_obligations_leaves_input_untouched). Tests
+    that edit a payload must deepcopy it first.
+    """
+    root = Path(__file__).resolve().parent.parent / "schemas"
+    return {p.stem: load_file(p) for p in root.glob("*.json")}
+
+
+@pytest.fixture(scope="session")
+def tool_registry(tmp_path_factory):
+    """Tool registry over the real contracts directory (read-only, shared).
+
+    Under xdist the first worker to get here pickles the registry into the
+    run's shared base temp dir; the others unpickle it instead of re-parsing
+    and re-validating every contract.
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker_id is None:
+        return ToolRegistry(fail_on_schema_error=True)
+    cache = tmp_path_factory.getbasetemp().parent / "tool_registry.pkl"
+    if cache.exists():
+        return pickle.loads(cache.read_bytes())
+    registry = ToolRegistry(fail_on_schema_error=True)
+    # Write-then-rename so other workers never read a partial pickle
+    partial = cache.with_name(f"{cache.name}.{worker_id}")
+    partial.write_bytes(pickle.dumps(registry))
+    os.replace(partial, cache)
+    return registry
+
+
+def _swap_trace_id(obj, old: str, new: str):
+    """Deep copy of a trace with every occurrence of old in its strings replaced by new."""
+    if isinstance(obj, dict):
+        return {k: _swap_trace_id(v, old, new) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_swap_trace_id(v, old, new) for v in obj]
+    if isinstance(obj, str):
+        return obj.replace(old, new)
+    return copy.deepcopy(obj)
+
+
+class ExecutionCache:
+    """Memoizes execute_obligations traces by canonical payload.
+
+    A hit returns a fresh copy of the stored trace with a new trace_id. Payloads
+    containing ACHIEVE obligations change stored state, so they always run and
+    drop every cached trace. Off unless a test opts in with the trace_cache marker.
+    """
+
+    def __init__(self, execute):
+        self._execute = execute
+        self._traces = {}
+        self.enabled = False
+
+    def clear(self):
+        self._traces.clear()
+
+    def __call__(self, obligations):
+        if any(o.get("type") == "ACHIEVE" for o in obligations.get("obligations", [])):
+            self.clear()
+            return self._execute(obligations)
+        if not self.enabled:
+            return self._execute(obligations)
+        key = orjson.dumps(obligations, option=orjson.OPT_SORT_KEYS)
+        hit = self._traces.get(key)
+        if hit is None:
+            trace = self._execute(obligations)
+            self._traces[key] = copy.deepcopy(trace)
+            return trace
+        # The trace_id is repeated in nested records; swap every occurrence
+        return _swap_trace_id(hit, hit["trace_id"], str(uuid.uuid4()))
+
+
+@pytest.fixture(scope="module")
+def api():
+    """In-memory MVPAPI shared by the tests in a module.
+
+    execute_obligations is wrapped in an ExecutionCache; mark a test with
+    trace_cache to memoize its read-only calls.
+    """
+    api = MVPAPI(":memory:")
+    api.execute_obligations = ExecutionCache(api.execute_obligations)
+    yield api
+    api.close()
+
+
+# Rows MVPAPI seeds at startup (_load_sample_data); everything else is written by runs
+_SAMPLE_DATA_TABLES = ("entity", "relation", "source")
+
+
+def _clear_tables(db, keep=()):
+    """Delete every row from db's tables, except the tables named in keep."""
+    conn = db.conn
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    for table in tables:
+        if table not in keep:
+            conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+
+@pytest.fixture(autouse=True)
+def _api_per_test(request):
+    """Per-test isolation for the shared module api.
+
+    Applies the trace_cache marker, then after the test drops what the test's
+    runs wrote (tool runs, assertions, obligations, ...) along with its cached
+    traces, which were recorded against that state.
+    """
+    if "api" not in request.fixturenames:
+        yield
+        return
+    api = request.getfixturevalue("api")
+    cache = api.execute_obligations
+    if not isinstance(cache, ExecutionCache):
+        # A module overriding the api fixture
+        yield
+        return
+    cache.enabled = request.node.get_closest_marker("trace_cache") is not None
+    yield
+    _clear_tables(api.handler.db, keep=_SAMPLE_DATA_TABLES)
+    cache.clear()
+    cache.enabled = False
+
+
+def _wait_for_server(http, base: str, timeout=10):
+    """One probe request; it waits in the listen backlog until the app is serving."""
+    try:
+        return http.get(base + "/v1/tools", timeout=timeout).status_code == 200
+    except (requests.ConnectionError, requests.Timeout):
+        # The server died before accepting (its socket closed with it)
+        return False
+
+
+@pytest.fixture(scope="session")
+def http():
+    """Keep-alive requests session for talking to api_server."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def api_server(tmp_path_factory, http):
+    """Base URL of a real HTTP API server ("python -m src.api") shared by the session.
+
+    It gets its own database under the session temp dir. The server binds port 0
+    itself and reports the port it got on stdout, so xdist workers (each with its
+    own server) never collide and nothing can take the port in between. That line
+    is printed once the socket is listening, so it is also the ready signal: no
+    polling, just one probe that queues until the app accepts it.
+    """
+    env = dict(os.environ, AI2_API_DB_PATH=str(tmp_path_factory.mktemp("api_server") / "ir.db"))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.api", "--host", "127.0.0.1", "--port", "0", "--log-level", "warning"],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        # "Listening on port N"; empty if the server exited before binding
+        line = proc.stdout.readline()
+        assert line.startswith("Listening on port "), f"API server did not start: {line!r}"
+        base = f"http://127.0.0.1:{line.split()[-1]}"
+        assert _wait_for_server(http, base), "API server did not start in time"
+        yield base
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """In-process TestClient for the FastAPI app (no server subprocess).
+
+    The app is served by its own in-memory MVPAPI for the session. Bodies may
+    be sent pre-encoded (content=_fastjson.encode(...)), so JSON is the default
+    content type.
+    """
+    from fastapi.testclient import TestClient
+
+    import src.api
+
+    session_api = MVPAPI(":memory:")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.api, "api", session_api)
+        yield TestClient(src.api.app, headers={"Content-Type": "application/json"})
+    session_api.close()
+
+
+def _no_print(*args, **kwargs):
+    pass
+
+
+@pytest.fixture(scope="session")
+def debug_print(pytestconfig):
+    """print under -v, a no-op otherwise (skips formatting and capture of debug dumps)."""
+    return print if pytestconfig.getoption("verbose") >= 1 else _no_print
+
+
+@pytest.fixture(scope="module")
+def mock_llm():
+    """Stateless MockLLM shared by the tests in a module."""
+    return MockLLM()
+
+
+@pytest.fixture(scope="module")
+def translator_in(mock_llm):
+    return TranslatorIn(mock_llm)
+
+
+@pytest.fixture(scope="module")
+def translator_out(mock_llm):
+    return TranslatorOut(mock_llm)
+
+
+@pytest.fixture(scope="module")
+def _module_db():
+    db = IRDatabase(":memory:")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def db(_module_db):
+    """In-memory IRDatabase, emptied after each test so tests stay isolated."""
+    yield _module_db
+    _clear_tables(_module_db)
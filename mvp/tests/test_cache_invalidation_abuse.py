@@ -7,16 +7,21 @@ Tests that cache correctly invalidates when:
 3. Tool contract versions change
 
 This test intentionally modifies dependencies and verifies cache behavior.
+Each case runs the same obligations three times; between runs 2 and 3 a
+small mutator callable changes the dependency under test.
 """
 
 import json
+import logging
 import os
-import sqlite3
 import sys
 import tempfile
 import time
+from contextlib import ExitStack
 from pathlib import Path
 
+import pytest
+
 # Add mvp to path
 mvp_dir = Path(__file__).resolve().parent.parent
 if str(mvp_dir) not in sys.path:
@@ -24,259 +29,149 @@ if str(mvp_dir) not in sys.path:
 
 from src.main import MVPAPI
 
+log = logging.getLogger(__name__)
 
-def test_env_var_cache_invalidation():
-    """Test that changing an env var invalidates cache."""
-    print("\n=== Test 1: Environment Variable Cache Invalidation ===")
-    
-    # Create a test tool contract that depends on an env var
-    test_env_var = "TEST_CACHE_ENV_VAR"
-    original_value = os.environ.get(test_env_var, "original")
-    
-    # Create obligations that would use a tool with env dependency
-    # (In real usage, you'd have a tool with depends_on: ["env:TEST_CACHE_ENV_VAR"])
-    obligations = {
-        "obligations": [
-            {
-                "type": "REPORT",
-                "payload": {
-                    "kind": "query.math",
-                    "expr": "2+2"
-                }
-            }
-        ]
-    }
-    
-    db_path = ".ir/test_cache_env.db"
-    if Path(db_path).exists():
-        Path(db_path).unlink()
-    
-    api = MVPAPI(db_path)
-    try:
-        # First run
-        trace1 = api.execute_obligations(obligations)
-        tool_runs1 = trace1.get("tool_runs", [])
-        cache_hits1 = [tr for tr in tool_runs1 if tr.get("cache_hit", False)]
-        actual_executions1 = len(tool_runs1) - len(cache_hits1)
-        print(f"Run 1: {actual_executions1} executions, {len(cache_hits1)} cache hits")
-        
-        # Second run (should cache)
-        trace2 = api.execute_obligations(obligations)
-        tool_runs2 = trace2.get("tool_runs", [])
-        cache_hits2 = [tr for tr in tool_runs2 if tr.get("cache_hit", False)]
-        actual_executions2 = len(tool_runs2) - len(cache_hits2)
-        print(f"Run 2: {actual_executions2} executions, {len(cache_hits2)} cache hits")
-        
-        # Change env var
-        os.environ[test_env_var] = "changed"
-        print(f"Changed {test_env_var} from '{original_value}' to 'changed'")
-        
-        # Third run (should invalidate cache if tool depends on env)
-        trace3 = api.execute_obligations(obligations)
-        tool_runs3 = trace3.get("tool_runs", [])
-        cache_hits3 = [tr for tr in tool_runs3 if tr.get("cache_hit", False)]
-        actual_executions3 = len(tool_runs3) - len(cache_hits3)
-        print(f"Run 3 (after env change): {actual_executions3} executions, {len(cache_hits3)} cache hits")
-        
-        # Restore original
-        if original_value:
-            os.environ[test_env_var] = original_value
-        else:
-            os.environ.pop(test_env_var, None)
-        
-        print(f"[PASS] Env var change test completed")
-        return {
-            "test": "env_var_invalidation",
-            "run1_executions": actual_executions1,
-            "run2_executions": actual_executions2,
-            "run3_executions": actual_executions3,
-            "cache_behavior": "observed"
-        }
-    finally:
-        api.close()
-
-
-def test_file_dependency_cache_invalidation():
-    """Test that changing a file dependency invalidates cache."""
-    print("\n=== Test 2: File Dependency Cache Invalidation ===")
-    
-    # Create a temporary file
+TEST_ENV_VAR = "TEST_CACHE_ENV_VAR"
+
+
+def _mut_env(api, cleanup):
+    """Change an env var; restored when the case finishes."""
+    original_value = os.environ.get(TEST_ENV_VAR)
+    mp = cleanup.enter_context(pytest.MonkeyPatch.context())
+    mp.setenv(TEST_ENV_VAR, "changed")
+    log.debug(f"Changed {TEST_ENV_VAR} from '{original_value}' to 'changed'")
+    return {}
+
+
+def _mut_file(api, cleanup):
+    """Rewrite a temporary file so its mtime/size change."""
     with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
         test_file = Path(f.name)
         f.write("original content")
-    
-    try:
-        obligations = {
-            "obligations": [
-                {
-                    "type": "REPORT",
-                    "payload": {
-                        "kind": "query.math",
-                        "expr": "3+3"
-                    }
-                }
-            ]
-        }
-        
-        db_path = ".ir/test_cache_file.db"
-        if Path(db_path).exists():
-            Path(db_path).unlink()
-        
-        api = MVPAPI(db_path)
-        try:
-            # First run
-            trace1 = api.execute_obligations(obligations)
-            tool_runs1 = trace1.get("tool_runs", [])
-            cache_hits1 = [tr for tr in tool_runs1 if tr.get("cache_hit", False)]
-            actual_executions1 = len(tool_runs1) - len(cache_hits1)
-            print(f"Run 1: {actual_executions1} executions, {len(cache_hits1)} cache hits")
-            
-            # Second run (should cache)
-            trace2 = api.execute_obligations(obligations)
-            tool_runs2 = trace2.get("tool_runs", [])
-            cache_hits2 = [tr for tr in tool_runs2 if tr.get("cache_hit", False)]
-            actual_executions2 = len(tool_runs2) - len(cache_hits2)
-            print(f"Run 2: {actual_executions2} executions, {len(cache_hits2)} cache hits")
-            
-            # Modify file (change content)
-            time.sleep(0.1)  # Ensure mtime changes
-            test_file.write_text("modified content")
-            print(f"Modified file: {test_file}")
-            
-            # Third run (should invalidate cache if tool depends on file)
-            trace3 = api.execute_obligations(obligations)
-            tool_runs3 = trace3.get("tool_runs", [])
-            cache_hits3 = [tr for tr in tool_runs3 if tr.get("cache_hit", False)]
-            actual_executions3 = len(tool_runs3) - len(cache_hits3)
-            print(f"Run 3 (after file change): {actual_executions3} executions, {len(cache_hits3)} cache hits")
-            
-            print(f"[PASS] File dependency change test completed")
-            return {
-                "test": "file_dependency_invalidation",
-                "file_path": str(test_file),
-                "run1_executions": actual_executions1,
-                "run2_executions": actual_executions2,
-                "run3_executions": actual_executions3,
-                "cache_behavior": "observed"
-            }
-        finally:
-            api.close()
-    finally:
-        # Cleanup
-        if test_file.exists():
-            test_file.unlink()
+    cleanup.callback(test_file.unlink, missing_ok=True)
+    time.sleep(0.1)  # Ensure mtime changes
+    test_file.write_text("modified content")
+    log.debug(f"Modified file: {test_file}")
+    return {"file_path": str(test_file)}
 
 
-def test_tool_version_cache_invalidation():
-    """Test that changing tool version invalidates cache."""
-    print("\n=== Test 3: Tool Version Cache Invalidation ===")
-    
+def _mut_ver(api, cleanup):
+    """Record the tool versions that are part of the cache key."""
+    # Note: In a real scenario, you would modify the tool contract version
+    # For this test, we're verifying the version is part of the cache key
+    cursor = api.handler.db.conn.cursor()
+    cursor.execute("SELECT tool_name, tool_version, COUNT(*) as count FROM tool_run GROUP BY tool_name, tool_version")
+    versions = [tuple(row) for row in cursor.fetchall()]
+    log.debug(f"Tool versions in cache: {versions}")
+    return {"versions_observed": versions, "cache_behavior": "version_in_cache_key"}
+
+
+# (case id, test name, math expression, mutator)
+ABUSE_CASES = [
+    ("env", "env_var_invalidation", "2+2", _mut_env),
+    ("file", "file_dependency_invalidation", "3+3", _mut_file),
+    ("ver", "tool_version_invalidation", "4+4", _mut_ver),
+]
+
+
+def _count_executions(trace):
+    """Return (actual executions, cache hits) for a trace."""
+    tool_runs = trace.get("tool_runs", [])
+    cache_hits = sum(1 for tr in tool_runs if tr.get("cache_hit", False))
+    return len(tool_runs) - cache_hits, cache_hits
+
+
+def _run_abuse_case(api, test_name, expr, mutator):
+    """Run obligations three times, mutating a dependency before run 3."""
     obligations = {
         "obligations": [
             {
                 "type": "REPORT",
                 "payload": {
                     "kind": "query.math",
-                    "expr": "4+4"
+                    "expr": expr
                 }
             }
         ]
     }
-    
-    db_path = ".ir/test_cache_version.db"
-    if Path(db_path).exists():
-        Path(db_path).unlink()
-    
-    api = MVPAPI(db_path)
-    try:
-        # First run
-        trace1 = api.execute_obligations(obligations)
-        tool_runs1 = trace1.get("tool_runs", [])
-        cache_hits1 = [tr for tr in tool_runs1 if tr.get("cache_hit", False)]
-        actual_executions1 = len(tool_runs1) - len(cache_hits1)
-        print(f"Run 1: {actual_executions1} executions, {len(cache_hits1)} cache hits")
-        
-        # Check tool version in cache
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT tool_name, tool_version, COUNT(*) as count FROM tool_run GROUP BY tool_name, tool_version")
-        versions_before = cursor.fetchall()
-        print(f"Tool versions in cache before: {versions_before}")
-        conn.close()
-        
-        # Second run (should cache)
-        trace2 = api.execute_obligations(obligations)
-        tool_runs2 = trace2.get("tool_runs", [])
-        cache_hits2 = [tr for tr in tool_runs2 if tr.get("cache_hit", False)]
-        actual_executions2 = len(tool_runs2) - len(cache_hits2)
-        print(f"Run 2: {actual_executions2} executions, {len(cache_hits2)} cache hits")
-        
-        # Note: In a real scenario, you would modify the tool contract version
-        # For this test, we're verifying the version is part of the cache key
-        print(f"[PASS] Tool version cache key test completed")
-        return {
-            "test": "tool_version_invalidation",
-            "run1_executions": actual_executions1,
-            "run2_executions": actual_executions2,
-            "versions_observed": versions_before,
-            "cache_behavior": "version_in_cache_key"
-        }
-    finally:
-        api.close()
+    result = {"test": test_name}
+    with ExitStack() as cleanup:
+        for run in (1, 2, 3):
+            if run == 3:
+                result.update({"cache_behavior": "observed", **mutator(api, cleanup)})
+            executions, cache_hits = _count_executions(api.execute_obligations(obligations))
+            log.debug(f"Run {run}: {executions} executions, {cache_hits} cache hits")
+            result[f"run{run}_executions"] = executions
+    log.debug(f"[PASS] {test_name} completed")
+    return result
+
+
+@pytest.fixture
+def api(tmp_path):
+    api = MVPAPI(str(tmp_path / "test_cache.db"))
+    yield api
+    api.close()
+
+
+@pytest.mark.parametrize(
+    "case",
+    ABUSE_CASES,
+    ids=lambda case: case[0],
+)
+def test_cache_invalidation(api, case):
+    """Mutating a dependency between runs must not break cached execution."""
+    _, test_name, expr, mutator = case
+    result = _run_abuse_case(api, test_name, expr, mutator)
+    assert result["test"] == test_name
+    # Run 1 executes, run 2 is served from cache
+    assert result["run1_executions"] >= 1
+    assert result["run2_executions"] < result["run1_executions"]
 
 
 def run_all_abuse_tests():
     """Run all abuse tests and generate report."""
-    print("=" * 60)
-    print("CACHE INVALIDATION ABUSE TESTS")
-    print("=" * 60)
-    
+    log.debug("=" * 60)
+    log.debug("CACHE INVALIDATION ABUSE TESTS")
+    log.debug("=" * 60)
+
     results = []
-    
-    try:
-        result1 = test_env_var_cache_invalidation()
-        results.append(result1)
-    except Exception as e:
-        print(f"[FAIL] Env var test failed: {e}")
-        results.append({"test": "env_var_invalidation", "status": "failed", "error": str(e)})
-    
-    try:
-        result2 = test_file_dependency_cache_invalidation()
-        results.append(result2)
-    except Exception as e:
-        print(f"[FAIL] File dependency test failed: {e}")
-        results.append({"test": "file_dependency_invalidation", "status": "failed", "error": str(e)})
-    
-    try:
-        result3 = test_tool_version_cache_invalidation()
-        results.append(result3)
-    except Exception as e:
-        print(f"[FAIL] Tool version test failed: {e}")
-        results.append({"test": "tool_version_invalidation", "status": "failed", "error": str(e)})
-    
+
+    for case_id, test_name, expr, mutator in ABUSE_CASES:
+        log.debug(f"=== {test_name} ===")
+        db_path = Path(".ir") / f"test_cache_{case_id}.db"
+        db_path.unlink(missing_ok=True)
+        api = MVPAPI(str(db_path))
+        try:
+            results.append(_run_abuse_case(api, test_name, expr, mutator))
+        except Exception as e:
+            log.warning(f"[FAIL] {test_name} failed: {e}")
+            results.append({"test": test_name, "status": "failed", "error": str(e)})
+        finally:
+            api.close()
+
     # Generate report
     report = {
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
         "tests_run": len(results),
         "results": results
     }
-    
+
     # Save report in project (gitignored)
-    mvp_dir = Path(__file__).resolve().parent.parent
     reports_dir = mvp_dir / ".reports"
     reports_dir.mkdir(parents=True, exist_ok=True)
     report_file = reports_dir / f"cache_invalidation_abuse_{int(time.time())}.json"
-    
+
     with open(report_file, "w") as f:
         json.dump(report, f, indent=2)
-    
+
     print(f"\n[REPORT] Saved to: {report_file}")
-    print("=" * 60)
-    print("ABUSE TESTS COMPLETE")
-    print("=" * 60)
-    
+    log.debug("=" * 60)
+    log.debug("ABUSE TESTS COMPLETE")
+    log.debug("=" * 60)
+
     return report
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     run_all_abuse_tests()
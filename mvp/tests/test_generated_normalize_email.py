@@ -1,10 +1,9 @@
-import importlib
+from src.tools_generated.normalize_email_tool import run
 
 
 def test_normalize_sample_payload():
-    mod = importlib.import_module('src.tools_generated.normalize_email_tool')
     payload = {"email": "JEFF@Example.COM ", "kind": "normalize_email"}
-    out = mod.run(payload)
+    out = run(payload)
     assert isinstance(out, dict)
     assert 'final_answer' in out
     assert out['final_answer'] == 'jeff@example.com'
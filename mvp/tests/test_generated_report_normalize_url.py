@@ -1,18 +1,20 @@
-import importlib
+import pytest
 
-
-def test_normalize_basic():
-    mod = importlib.import_module('src.tools_generated.report_normalize_url')
-    res = mod.run({'url': 'www.bob.com'})
-    assert isinstance(res, dict)
-    assert res.get('normalized_url') == 'https://www.bob.com'
-    assert 'Normalized URL: https://www.bob.com' in res.get('final_answer', '')
+from src.tools_generated.report_normalize_url import run
 
 
-def test_normalize_with_query_and_case():
-    mod = importlib.import_module('src.tools_generated.report_normalize_url')
-    res = mod.run({'url': 'HTTP://Example.COM:80/a/b/?b=2&a=1#frag'})
-    # scheme http with port 80 is default and should be preserved as http if provided scheme was http
-    # but default ports should be removed; we expect scheme lowercased, host lowercased, sorted query
-    assert res.get('normalized_url') == 'http://example.com/a/b?a=1&b=2'
-    assert 'Normalized URL: http://example.com/a/b?a=1&b=2' in res.get('final_answer', '')
+# scheme http with port 80 is default and should be preserved as http if provided scheme was http
+# but default ports should be removed; we expect scheme lowercased, host lowercased, sorted query
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ('www.bob.com', 'https://www.bob.com'),
+        ('HTTP://Example.COM:80/a/b/?b=2&a=1#frag', 'http://example.com/a/b?a=1&b=2'),
+    ],
+    ids=["basic", "with_query_and_case"],
+)
+def test_normalize(url, expected):
+    res = run({'url': url})
+    assert isinstance(res, dict)
+    assert res.get('normalized_url') == expected
+    assert f'Normalized URL: {expected}' in res.get('final_answer', '')
@@ -1,96 +1,66 @@
 import json
-import requests
-import time
-import sys
-from subprocess import Popen, PIPE
 
-BASE = "http://127.0.0.1:8000"
 
-
-def wait_for_server(timeout=10):
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            r = requests.get(BASE + "/v1/tools", timeout=1)
-            if r.status_code == 200:
-                return True
-        except Exception:
-            time.sleep(0.2)
-    return False
-
-
-def test_reasoning_grandparent_true_and_false():
-    proc = Popen([sys.executable, "-m", "src.api"], stdout=PIPE, stderr=PIPE)
-    try:
-        assert wait_for_server(), "API server did not start in time"
-
-        # Positive case: Alice -> Bob -> Cara
-        body = {
-            "obligations": [
-                {
-                    "type": "REPORT",
-                    "payload": {
-                        "kind": "logic",
-                        "mode": "deduction",
-                        "domains": ["kinship"],
-                        "query": {"predicate": "grandparentOf", "args": ["Alice", "Cara"]},
-                        "facts": [
-                            {"predicate": "parentOf", "args": ["Alice", "Bob"]},
-                            {"predicate": "parentOf", "args": ["Bob", "Cara"]}
-                        ],
-                        "budgets": {"max_depth": 3, "beam": 4, "time_ms": 100}
-                    }
+def test_reasoning_grandparent_true_and_false(client):
+    # Positive case: Alice -> Bob -> Cara
+    body = {
+        "obligations": [
+            {
+                "type": "REPORT",
+                "payload": {
+                    "kind": "logic",
+                    "mode": "deduction",
+                    "domains": ["kinship"],
+                    "query": {"predicate": "grandparentOf", "args": ["Alice", "Cara"]},
+                    "facts": [
+                        {"predicate": "parentOf", "args": ["Alice", "Bob"]},
+                        {"predicate": "parentOf", "args": ["Bob", "Cara"]}
+                    ],
+                    "budgets": {"max_depth": 3, "beam": 4, "time_ms": 100}
                 }
-            ]
-        }
-        print("\n[Deduction: Positive] Request:")
-        print(json.dumps(body, indent=2))
-        r = requests.post(BASE + "/v1/obligations/execute", json=body)
-        print("Status:", r.status_code)
-        data = r.json()
-        print("Response trace (truncated): final_answer=", data.get("final_answer"))
-        print("Tool runs:", data.get("tool_runs"))
-        print("Assertions:", data.get("assertions"))
-        expected = "true"
-        actual = data.get("final_answer")
-        print("Expected:", expected, "Actual:", actual)
-        assert r.status_code == 200
-        assert actual == expected
+            }
+        ]
+    }
+    print("\n[Deduction: Positive] Request:")
+    print(json.dumps(body, indent=2))
+    r = client.post("/v1/obligations/execute", json=body)
+    print("Status:", r.status_code)
+    data = r.json()
+    print("Response trace (truncated): final_answer=", data.get("final_answer"))
+    print("Tool runs:", data.get("tool_runs"))
+    print("Assertions:", data.get("assertions"))
+    expected = "true"
+    actual = data.get("final_answer")
+    print("Expected:", expected, "Actual:", actual)
+    assert r.status_code == 200
+    assert actual == expected
 
-        # Negative case: no chain
-        body_neg = {
-            "obligations": [
-                {
-                    "type": "REPORT",
-                    "payload": {
-                        "kind": "logic",
-                        "mode": "deduction",
-                        "domains": ["kinship"],
-                        "query": {"predicate": "grandparentOf", "args": ["Alice", "Zoe"]},
-                        "facts": [
-                            {"predicate": "parentOf", "args": ["Alice", "Bob"]}
-                        ],
-                        "budgets": {"max_depth": 3, "beam": 4, "time_ms": 100}
-                    }
+    # Negative case: no chain
+    body_neg = {
+        "obligations": [
+            {
+                "type": "REPORT",
+                "payload": {
+                    "kind": "logic",
+                    "mode": "deduction",
+                    "domains": ["kinship"],
+                    "query": {"predicate": "grandparentOf", "args": ["Alice", "Zoe"]},
+                    "facts": [
+                        {"predicate": "parentOf", "args": ["Alice", "Bob"]}
+                    ],
+                    "budgets": {"max_depth": 3, "beam": 4, "time_ms": 100}
                 }
-            ]
-        }
-        print("\n[Deduction: Negative] Request:")
-        print(json.dumps(body_neg, indent=2))
-        r = requests.post(BASE + "/v1/obligations/execute", json=body_neg)
-        print("Status:", r.status_code)
-        data = r.json()
-        print("Response trace (truncated): final_answer=", data.get("final_answer"))
-        expected = "false"
-        actual = data.get("final_answer")
-        print("Expected:", expected, "Actual:", actual)
-        assert r.status_code == 200
-        assert actual == expected
-    finally:
-        proc.terminate()
-        try:
-            proc.wait(timeout=5)
-        except Exception:
-            proc.kill()
-
-
+            }
+        ]
+    }
+    print("\n[Deduction: Negative] Request:")
+    print(json.dumps(body_neg, indent=2))
+    r = client.post("/v1/obligations/execute", json=body_neg)
+    print("Status:", r.status_code)
+    data = r.json()
+    print("Response trace (truncated): final_answer=", data.get("final_answer"))
+    expected = "false"
+    actual = data.get("final_answer")
+    print("Expected:", expected, "Actual:", actual)
+    assert r.status_code == 200
+    assert actual == expected
@@ -5,8 +5,8 @@ This module tests all components of the Obligations → Operations architecture.
 """
 
 import pytest
+import copy
 import json
-import tempfile
 import os
 from unittest.mock import Mock, patch
 
@@ -29,47 +29,48 @@ def report(label: str, expected, actual) -> None:
 class TestDatabase:
     """Test the IR database layer."""
     
-    def setup_method(self):
-        """Set up test database."""
-        self.db = IRDatabase(":memory:")
-    
-    def teardown_method(self):
-        """Clean up test database."""
-        self.db.close()
-    
-    def test_create_entity(self):
+    def test_create_entity(self, db):
         """Test entity creation."""
         entity = Entity("E1", "person", {"name": "Alice"})
-        entity_id = self.db.create_entity(entity)
+        entity_id = db.create_entity(entity)
         assert entity_id == "E1"
     
-    def test_create_relation(self):
+    def test_create_relation(self, db):
         """Test relation creation."""
         # Create entities first
-        self.db.create_entity(Entity("E1", "person"))
-        self.db.create_entity(Entity("E2", "person"))
+        db.create_entity(Entity("E1", "person"))
+        db.create_entity(Entity("E2", "person"))
         
         relation = Relation("R1", "E1", "friend", "E2")
-        relation_id = self.db.create_relation(relation)
+        relation_id = db.create_relation(relation)
         assert relation_id == "R1"
     
-    def test_create_assertion(self):
+    def test_create_assertion(self, db):
         """Test assertion creation."""
         assertion = Assertion("A1", "E1", "evaluatesTo", "4", 1.0)
-        assertion_id = self.db.create_assertion(assertion)
+        assertion_id = db.create_assertion(assertion)
         assert assertion_id == "A1"
     
-    def test_get_assertions_by_subject(self):
+    def test_get_assertions_by_subject(self, db):
         """Test getting assertions by subject."""
         # Create assertion
         assertion = Assertion("A1", "E1", "evaluatesTo", "4", 1.0)
-        self.db.create_assertion(assertion)
+        db.create_assertion(assertion)
         
         # Retrieve assertions
-        assertions = self.db.get_assertions_by_subject("E1")
+        assertions = db.get_assertions_by_subject("E1")
         assert len(assertions) == 1
         assert assertions[0].predicate == "evaluatesTo"
         assert assertions[0].object == "4"
+    
+    def test_clear_tool_runs(self, db):
+        """Clearing tool runs empties the tool cache."""
+        db.create_tool_run(ToolRun("TR1", "EvalMath", {"expr": "2+2"}, {"result": 4}, "completed",
+                                   input_hash="k1", tool_version="1.0.0"))
+        assert db.lookup_tool_cache("EvalMath", "k1", "1.0.0") == {"result": 4}
+        
+        assert db.clear_tool_runs() == 1
+        assert db.lookup_tool_cache("EvalMath", "k1", "1.0.0") is None
 
 
 class TestObligations:
@@ -132,17 +133,7 @@ class TestObligations:
         assert len(people_obligation["payload"]["filters"]) == 2
 
 
-class TestTools:
-    """Test tool registry and execution."""
-    
-    def setup_method(self):
-        """Set up test tools."""
-        # Create temporary contracts directory
-        self.temp_dir = tempfile.mkdtemp()
-        os.makedirs(f"{self.temp_dir}/tools", exist_ok=True)
-        
-        # Create test tool contract
-        test_tool_yaml = """
+TEST_TOOL_YAML = """
 name: TestEvalMath
 description: Test math evaluator
 version: 1.0.0
@@ -172,18 +163,23 @@ implementation:
   type: python
   entry_point: test_evalmath.evaluate
 """
-        
-        with open(f"{self.temp_dir}/tools/test_evalmath.yaml", "w") as f:
-            f.write(test_tool_yaml)
-    
-    def teardown_method(self):
-        """Clean up test files."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+
+
+@pytest.fixture(scope="class")
+def test_contracts_dir(tmp_path_factory):
+    """Temporary contracts directory holding TEST_TOOL_YAML, built once per class."""
+    d = tmp_path_factory.mktemp("contracts")
+    (d / "tools").mkdir()
+    (d / "tools" / "test_evalmath.yaml").write_text(TEST_TOOL_YAML)
+    return str(d)
+
+
+class TestTools:
+    """Test tool registry and execution."""
     
-    def test_tool_registry(self):
+    def test_tool_registry(self, test_contracts_dir):
         """Test tool registry loading."""
-        registry = ToolRegistry(self.temp_dir, fail_on_schema_error=True)
+        registry = ToolRegistry(test_contracts_dir, fail_on_schema_error=True)
         
         # Should load the test tool
         assert "TestEvalMath" in registry.list_tools()
@@ -194,9 +190,9 @@ implementation:
         assert tool.reliability == "high"
         assert tool.cost == "tiny"
     
-    def test_tool_selection(self):
+    def test_tool_selection(self, test_contracts_dir):
         """Test tool selection policy."""
-        registry = ToolRegistry(self.temp_dir, fail_on_schema_error=True)
+        registry = ToolRegistry(test_contracts_dir, fail_on_schema_error=True)
         
         # Find tools for REPORT obligation
         tools = registry.find_tools_for_obligation("REPORT")
@@ -207,9 +203,9 @@ implementation:
         can_handle, reason = registry.validate_tool_inputs(tools[0], payload)
         assert can_handle == True
     
-    def test_tool_execution(self):
+    def test_tool_execution(self, test_contracts_dir):
         """Test tool execution."""
-        registry = ToolRegistry(self.temp_dir)
+        registry = ToolRegistry(test_contracts_dir)
         executor = ToolExecutor(registry)
         
         # Test EvalMath execution
@@ -227,15 +223,10 @@ implementation:
 class TestConductor:
     """Test conductor orchestration."""
     
-    def setup_method(self):
-        """Set up test conductor."""
-        self.db = IRDatabase(":memory:")
-        self.registry = ToolRegistry()
-        self.conductor = Conductor(self.db, self.registry)
-    
-    def teardown_method(self):
-        """Clean up test conductor."""
-        self.db.close()
+    @pytest.fixture(autouse=True)
+    def _conductor(self, db, tool_registry):
+        """Set up test conductor over the shared registry."""
+        self.conductor = Conductor(db, tool_registry)
     
     def test_execution_result(self):
         """Test execution result creation."""
@@ -263,30 +254,22 @@ class TestConductor:
 class TestTranslators:
     """Test translator interfaces."""
     
-    def test_mock_llm(self):
+    def test_mock_llm(self, mock_llm):
         """Test mock LLM responses."""
-        mock_llm = MockLLM()
-        
         # Test math question
         response = mock_llm.generate("What's 2+2?")
         data = json.loads(response)
         assert "obligations" in data
         assert len(data["obligations"]) >= 1
     
-    def test_translator_in(self):
+    def test_translator_in(self, translator_in):
         """Test input translator."""
-        mock_llm = MockLLM()
-        translator_in = TranslatorIn(mock_llm)
-        
         result = translator_in.translate("What's 2+2?")
         assert "obligations" in result
         assert len(result["obligations"]) >= 1
     
-    def test_translator_out(self):
+    def test_translator_out(self, translator_out):
         """Test output translator."""
-        mock_llm = MockLLM()
-        translator_out = TranslatorOut(mock_llm)
-        
         assertions = [
             {"subject_id": "Expr_1", "predicate": "evaluatesTo", "object": "4"}
         ]
@@ -300,60 +283,58 @@ class TestTranslators:
 class TestMVPIntegration:
     """Test full MVP system integration."""
     
-    def setup_method(self):
-        """Set up test API."""
-        self.api = MVPAPI(":memory:")
-    
-    def teardown_method(self):
-        """Clean up test API."""
-        self.api.close()
-    
-    def test_math_question(self):
-        """Test math question processing."""
-        answer = self.api.ask("What's 2+2?")
-        report("API answer for 2+2", expected="4 (final may be gated by VERIFY)", actual=answer)
-        assert isinstance(answer, str)
-        assert len(answer) > 0
-    
-    def test_counting_question(self):
-        """Test counting question processing."""
-        answer = self.api.ask("How many r's in 'strawberry'?")
-        report("API answer for count r in 'strawberry'", expected="3 (final may be gated by VERIFY)", actual=answer)
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "What's 2+2?",
+            "How many r's in 'strawberry'?",
+            "",
+            "What is the meaning of life?",
+        ],
+        ids=["math", "counting", "empty", "unknown"],
+    )
+    def test_ask_returns_string(self, api, question):
+        """ask() always answers with a string, including for empty or unknown input."""
+        answer = api.ask(question)
+        report(f"API answer for {question!r}", expected="non-empty string", actual=answer)
         assert isinstance(answer, str)
         assert len(answer) > 0
     
     def test_clarify_then_resolve_name(self):
         """CLARIFY path then resolve name and answer."""
         # No name stored yet → expect clarify
-        # Call deterministic obligations API
-        from src.main import MVPAPI
-        api = MVPAPI()
-        trace1 = api.execute_obligations({
-            "obligations": [
-                {"type": "REPORT", "payload": {"kind": "status.name"}}
-            ]
-        })
-        assert trace1.get('final_answer','') == ""
-        assert 'clarify' in trace1 and 'name' in trace1['clarify']
+        # Fresh in-memory instance: the persistent .ir/ir.db may already hold a name
+        api = MVPAPI(":memory:")
+        try:
+            trace1 = api.execute_obligations({
+                "obligations": [
+                    {"type": "REPORT", "payload": {"kind": "status.name"}}
+                ]
+            })
+            assert trace1.get('final_answer','') == ""
+            assert 'clarify' in trace1 and 'name' in trace1['clarify']
+            assert None not in trace1['tool_runs_by_name']
 
-        # Provide name via ACHIEVE
-        _ = api.execute_obligations({
-            "obligations": [
-                {"type": "ACHIEVE", "payload": {"state": "status.name", "value": "Jeff"}}
-            ]
-        })
+            # Provide name via ACHIEVE
+            _ = api.execute_obligations({
+                "obligations": [
+                    {"type": "ACHIEVE", "payload": {"state": "status.name", "value": "Jeff"}}
+                ]
+            })
         
-        # Ask again → should return stored name
-        trace2 = api.execute_obligations({
-            "obligations": [
-                {"type": "REPORT", "payload": {"kind": "status.name"}}
-            ]
-        })
-        assert trace2.get('final_answer','') == 'Jeff'
-    
-    def test_people_query(self):
+            # Ask again → should return stored name
+            trace2 = api.execute_obligations({
+                "obligations": [
+                    {"type": "REPORT", "payload": {"kind": "status.name"}}
+                ]
+            })
+            assert trace2.get('final_answer','') == 'Jeff'
+        finally:
+            api.close()
+    
+    def test_people_query(self, api):
         """Test people query processing via deterministic obligations API."""
-        trace = self.api.execute_obligations({
+        trace = api.execute_obligations({
             "obligations": [
                 {
                     "type": "REPORT",
@@ -373,9 +354,9 @@ class TestMVPIntegration:
         assert isinstance(names, list)
         assert set(names) >= {"Alice Smith", "Bob Johnson"}
     
-    def test_full_trace(self):
+    def test_full_trace(self, api):
         """Test full trace generation."""
-        trace = self.api.execute_obligations({
+        trace = api.execute_obligations({
             "obligations": [
                 {"type": "REPORT", "payload": {"kind": "math", "expr": "2+2"}}
             ]
@@ -396,9 +377,22 @@ class TestMVPIntegration:
         assert "total_latency_ms" in metrics
         assert "success_rate" in metrics
     
-    def test_system_status(self):
+    @pytest.mark.parametrize("name", [
+        "obligations.demo_chain_emails_batch_domains",
+        "obligations.demo_chain_math_then_normalize_email_template",
+        "obligations.demo_math_tool_choice",
+        "obligations.workflow_email_domains_denylist",
+    ])
+    def test_execute_obligations_leaves_input_untouched(self, api, schemas, name):
+        """Execution must not mutate its input; the shared schemas fixture relies on it."""
+        obligations = schemas[name]
+        snapshot = copy.deepcopy(obligations)
+        api.execute_obligations(obligations)
+        assert obligations == snapshot
+    
+    def test_system_status(self, api):
         """Test system status."""
-        status = self.api.status()
+        status = api.status()
         assert "status" in status
         assert "tools_registered" in status
         assert "tool_names" in status
@@ -408,29 +402,9 @@ class TestMVPIntegration:
 class TestErrorHandling:
     """Test error handling and edge cases."""
     
-    def setup_method(self):
-        """Set up test API."""
-        self.api = MVPAPI(":memory:")
-    
-    def teardown_method(self):
-        """Clean up test API."""
-        self.api.close()
-    
-    def test_invalid_input(self):
-        """Test handling of invalid input."""
-        answer = self.api.ask("")
-        assert isinstance(answer, str)
-        assert len(answer) > 0
-    
-    def test_unknown_question(self):
-        """Test handling of unknown question types."""
-        answer = self.api.ask("What is the meaning of life?")
-        assert isinstance(answer, str)
-        assert len(answer) > 0
-    
-    def test_error_trace(self):
+    def test_error_trace(self, api):
         """Test error trace generation."""
-        trace = self.api.execute_obligations({"obligations": []})
+        trace = api.execute_obligations({"obligations": []})
         assert "trace_id" in trace
         # Empty obligations are invalid; engine returns error response
         assert trace.get("final_answer", "").startswith("Error:")
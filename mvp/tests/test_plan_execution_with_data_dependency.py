@@ -1,8 +1,3 @@
-import json
-
-from src.main import MVPAPI
-
-
 def _find_tool_run(trace: dict, tool_name: str) -> dict | None:
     for tr in trace.get("tool_runs", []) or []:
         if tr.get("tool_name") == tool_name:
@@ -10,7 +5,7 @@ def _find_tool_run(trace: dict, tool_name: str) -> dict | None:
     return None
 
 
-def test_plan_execution_resolves_step_output_templates():
+def test_plan_execution_resolves_step_output_templates(api, schemas):
     """
     Test 2: Composition with data dependency (step 2 uses step 1 output).
 
@@ -23,15 +18,9 @@ def test_plan_execution_resolves_step_output_templates():
       - ReportNormalizeEmail tool input shows the substituted value (JEFF+4@Example.COM)
       - Output is normalized and includes the substituted value (jeff+4@example.com)
     """
-    obligations = json.loads(
-        open("schemas/obligations.demo_chain_math_then_normalize_email_template.json", "r", encoding="utf-8-sig").read()
-    )
-
-    api = MVPAPI(":memory:")
-    try:
-        trace = api.execute_obligations(obligations)
-    finally:
-        api.close()
+    obligations = schemas["obligations.demo_chain_math_then_normalize_email_template"]
+
+    trace = api.execute_obligations(obligations)
 
     assert trace.get("status") == "resolved"
 
@@ -1,6 +1,4 @@
-import json
-
-from src.main import MVPAPI
+from _fastjson import loads
 
 
 def _tool_run(trace: dict, name: str) -> dict | None:
@@ -10,7 +8,7 @@ def _tool_run(trace: dict, name: str) -> dict | None:
     return None
 
 
-def test_shape_transform_pipeline_emails_to_domains():
+def test_shape_transform_pipeline_emails_to_domains(api, schemas):
     """
     Data-dependent composition with shape transform:
       Step 1: extract emails -> outputs.emails (list)
@@ -21,15 +19,9 @@ def test_shape_transform_pipeline_emails_to_domains():
       - Trace proves $ref substitution occurred (step2/step3 tool_run inputs contain lists, not $ref dicts)
       - Final distinct domain count matches expected
     """
-    obligations = json.loads(
-        open("schemas/obligations.demo_chain_emails_batch_domains.json", "r", encoding="utf-8-sig").read()
-    )
+    obligations = schemas["obligations.demo_chain_emails_batch_domains"]
 
-    api = MVPAPI(":memory:")
-    try:
-        trace = api.execute_obligations(obligations)
-    finally:
-        api.close()
+    trace = api.execute_obligations(obligations)
 
     assert trace.get("status") == "resolved"
 
@@ -49,8 +41,8 @@ def test_shape_transform_pipeline_emails_to_domains():
     # Prove shape substitution: domain counter consumes normalized_emails list.
     assert (cd.get("inputs") or {}).get("emails") == normalized
     assert (cd.get("outputs") or {}).get("distinct_domain_count") == 2
-    # Parent final_answer is a JSON list of each step's final_answer.
-    step_answers = json.loads(trace.get("final_answer"))
-    assert step_answers == [json.dumps(extracted), json.dumps(normalized), "2"]
+    # Parent final_answer is a JSON list of each step's final_answer (each itself JSON-encoded).
+    step_answers = [loads(answer) for answer in loads(trace.get("final_answer"))]
+    assert step_answers == [extracted, normalized, 2]
 
 
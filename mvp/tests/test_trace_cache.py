@@ -0,0 +1,46 @@
+"""
+Tests for the api fixture's trace cache (conftest.ExecutionCache).
+
+The tests in this module share one module-scoped api, so they also check that
+nothing cached in one test is replayed in the next.
+"""
+
+import json
+
+import pytest
+
+REPORT_NAME = {"obligations": [{"type": "REPORT", "payload": {"kind": "status.name"}}]}
+ACHIEVE_NAME = {
+    "obligations": [
+        {"type": "ACHIEVE", "payload": {"state": "status.name", "value": "Jeff"}}
+    ]
+}
+
+
+@pytest.mark.trace_cache
+def test_cache_handles_clarify_and_state_changes(api):
+    """Nameless (clarify) tool runs are cached, and an ACHIEVE drops cached reads."""
+    first = api.execute_obligations(REPORT_NAME)
+    second = api.execute_obligations(REPORT_NAME)
+    assert 'name' in second['clarify']
+    assert second['trace_id'] != first['trace_id']
+    assert first['trace_id'] not in json.dumps(second)
+
+    api.execute_obligations(ACHIEVE_NAME)
+    assert api.execute_obligations(REPORT_NAME).get('final_answer') == 'Jeff'
+
+
+@pytest.mark.trace_cache
+def test_cache_stores_read_after_achieve(api):
+    """Leaves a cached REPORT answered from state this test wrote."""
+    api.execute_obligations(ACHIEVE_NAME)
+    assert api.execute_obligations(REPORT_NAME).get('final_answer') == 'Jeff'
+    assert api.execute_obligations(REPORT_NAME).get('final_answer') == 'Jeff'
+
+
+@pytest.mark.trace_cache
+def test_cache_does_not_leak_across_tests(api):
+    """The previous test's name is gone, so the same REPORT must clarify again."""
+    trace = api.execute_obligations(REPORT_NAME)
+    assert trace.get('final_answer', '') == ""
+    assert 'name' in trace['clarify']
@@ -1,19 +1,9 @@
-import json
-
-from src.main import MVPAPI
-
-
 def _tool_names(trace: dict) -> list[str]:
     return [tr.get("tool_name") for tr in trace.get("tool_runs", []) or [] if tr.get("tool_name")]
 
 
-def test_workflow_email_domains_branches_to_clarify_when_no_emails_found():
-    obligations = json.loads(open("schemas/obligations.workflow_email_domains_clarify.json", "r", encoding="utf-8-sig").read())
-    api = MVPAPI(":memory:")
-    try:
-        trace = api.execute_obligations(obligations)
-    finally:
-        api.close()
+def test_workflow_email_domains_branches_to_clarify_when_no_emails_found(api, schemas):
+    trace = api.execute_obligations(schemas["obligations.workflow_email_domains_clarify"])
 
     assert trace.get("status") == "clarify"
     assert "text" in (trace.get("clarify") or [])
@@ -26,13 +16,8 @@ def test_workflow_email_domains_branches_to_clarify_when_no_emails_found():
     assert "EmailOps.CountDistinctDomains" not in tools
 
 
-def test_workflow_email_domains_propagates_denylist_domains():
-    obligations = json.loads(open("schemas/obligations.workflow_email_domains_denylist.json", "r", encoding="utf-8-sig").read())
-    api = MVPAPI(":memory:")
-    try:
-        trace = api.execute_obligations(obligations)
-    finally:
-        api.close()
+def test_workflow_email_domains_propagates_denylist_domains(api, schemas):
+    trace = api.execute_obligations(schemas["obligations.workflow_email_domains_denylist"])
 
     assert trace.get("status") == "resolved"
     tools = _tool_names(trace)
@@ -46,18 +31,9 @@ def test_workflow_email_domains_propagates_denylist_domains():
     assert dom_run["outputs"]["distinct_domain_count"] == 1
 
 
-def test_workflow_email_domains_chooses_strict_extractor_when_constrained():
-    obligations = json.loads(
-        open("schemas/obligations.workflow_email_domains_constraints_strict.json", "r", encoding="utf-8-sig").read()
-    )
-    api = MVPAPI(":memory:")
-    try:
-        trace = api.execute_obligations(obligations)
-    finally:
-        api.close()
+def test_workflow_email_domains_chooses_strict_extractor_when_constrained(api, schemas):
+    trace = api.execute_obligations(schemas["obligations.workflow_email_domains_constraints_strict"])
 
     assert trace.get("status") == "resolved"
     tools = _tool_names(trace)
     assert "EmailOps.ExtractStrict" in tools
-
-
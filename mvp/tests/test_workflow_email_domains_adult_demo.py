@@ -9,33 +9,29 @@ Adult demo: workflow.email_domains showing all four pillars in one run:
 """
 
 import json
+from pathlib import Path
+
+try:
+    from _fastjson import load_file
+except ImportError:
+    # Run as "python -m tests.test_workflow_email_domains_adult_demo" (tests/ not on sys.path)
+    from tests._fastjson import load_file
 from src.main import MVPAPI
 
 
-def test_workflow_email_domains_adult_demo():
+def test_workflow_email_domains_adult_demo(tmp_path):
     """Run the adult demo showing all four properties."""
-    import os
-    import sqlite3
-    from pathlib import Path
-    
-    # Use persistent DB to show caching across runs
-    db_path = ".ir/test_adult_demo.db"
-    
-    # Clear cache before first run to ensure clean state
-    # (Delete tool_run entries to clear cache, but keep other data)
-    if Path(db_path).exists():
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tool_run")
-        conn.commit()
-        conn.close()
-        print("Cleared tool_run cache for fresh start")
+    # File-backed (WAL) DB so the cache lives in real storage; under pytest
+    # tmp_path is fresh, so there is nothing to clear
+    db_path = str(Path(tmp_path) / "test_adult_demo.db")
     
     api = MVPAPI(db_path)
     try:
-        obligations = json.loads(
-            open("schemas/obligations.workflow_email_domains_adult_demo.json", "r", encoding="utf-8-sig").read()
-        )
+        # Clear cache before first run to ensure clean state (keeps other data)
+        if api.clear_tool_cache():
+            print("Cleared tool_run cache for fresh start")
+        
+        obligations = load_file("schemas/obligations.workflow_email_domains_adult_demo.json")
         
         # First run: should execute all tools
         trace1 = api.execute_obligations(obligations)
@@ -120,6 +116,8 @@ def test_workflow_email_domains_adult_demo():
 
 
 if __name__ == "__main__":
-    test_workflow_email_domains_adult_demo()
+    ir_dir = Path(__file__).resolve().parent.parent / ".ir"
+    ir_dir.mkdir(exist_ok=True)
+    test_workflow_email_domains_adult_demo(ir_dir)
     print("Adult demo passed!")
 
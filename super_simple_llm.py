@@ -16,8 +16,8 @@ Usage examples:
 """
 
 import argparse
+import functools
 import os
-import re
 import sys
 import unicodedata
 from typing import List
@@ -28,34 +28,44 @@ from pydantic import BaseModel
 # -------------------------
 # Output sanitizer
 # -------------------------
-NONCHAR_PATTERN = re.compile(
+# Code points to strip, as a str.translate table (one C-level pass)
+_STRIP_TABLE = dict.fromkeys(
     # ASCII control chars except \n, \r, \t  + DEL
-    r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]"
+    [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F]
     # UTF-16 surrogate range (shouldn't appear in well-formed Python strs, but just in case)
-    r"|[\uD800-\uDFFF]"
+    + [*range(0xD800, 0xE000)]
     # Noncharacters like U+FFFE, U+FFFF, U+FDD0–U+FDEF
-    r"|\uFFFE|\uFFFF|[\uFDD0-\uFDEF]"
+    + [0xFFFE, 0xFFFF, *range(0xFDD0, 0xFDF0)]
+    # Some terminals choke on bidirectional isolates — strip them too
+    + [0x2066, 0x2067, 0x2068, 0x2069]
 )
 
 def clean_text(s: str) -> str:
     if not isinstance(s, str):
         s = str(s)
-    # Normalize to NFC to reduce odd composition issues
-    s = unicodedata.normalize("NFC", s)
-    # Strip non-printable / noncharacters we don't want
-    s = NONCHAR_PATTERN.sub("", s)
-    # Some terminals choke on bidirectional isolates — strip if needed
-    s = s.replace("\u2066", "").replace("\u2067", "").replace("\u2068", "").replace("\u2069", "")
-    return s
-
-def safe_print(s: str) -> None:
-    # Try to ensure UTF-8 stdout on Windows / weird shells
+    # Normalize to NFC to reduce odd composition issues (ASCII is already
+    # NFC), then strip non-printable / noncharacters we don't want
+    if not s.isascii():
+        s = unicodedata.normalize("NFC", s)
+    return s.translate(_STRIP_TABLE)
+
+_stdout_configured = False
+
+def _configure_stdout_once() -> None:
+    # Try to ensure UTF-8 stdout on Windows / weird shells (first print only)
+    global _stdout_configured
+    if _stdout_configured:
+        return
+    _stdout_configured = True
     out = sys.stdout
     if hasattr(out, "reconfigure"):
         try:
             out.reconfigure(encoding="utf-8")
         except Exception:
             pass
+
+def safe_print(s: str) -> None:
+    _configure_stdout_once()
     try:
         print(clean_text(s))
     except UnicodeEncodeError:
@@ -65,8 +75,10 @@ def safe_print(s: str) -> None:
 # -------------------------
 # OpenAI client
 # -------------------------
+@functools.lru_cache(maxsize=1)
 def make_client() -> OpenAI:
-    # OPENAI_API_KEY should be set in the environment
+    # OPENAI_API_KEY should be set in the environment. Cached so repeated calls
+    # share one client (and its keep-alive connection pool)
     return OpenAI()
 
 # -------------------------